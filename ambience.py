@@ -12,8 +12,11 @@
 
 # pylint: disable=wrong-import-position
 
+from abc import ABC, abstractmethod
 import argparse
 from contextlib import redirect_stdout
+import ctypes
+import ctypes.util
 import fcntl
 from fnmatch import fnmatch
 import hashlib
@@ -21,11 +24,13 @@ from io import StringIO
 import json
 import os
 import random
+import struct
 import sys
 import termios
 import time
 import tty
-from typing import Dict, List, Tuple
+import weakref
+from typing import Dict, List, Optional, Tuple
 
 with redirect_stdout(StringIO()):
     import pygame
@@ -44,8 +49,16 @@ with redirect_stdout(StringIO()):
         USEREVENT,
     )
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 AMBIENT_TICK = USEREVENT + 1
 SOUND_LIBRARY = "ambience-library.json"
+PROBE_CACHE = "probe-cache.json"
+BACKENDS = ["pygame", "null"]
+GENERATOR_PREFIX = "gen:"
 
 
 class AmbientSounds:
@@ -67,8 +80,13 @@ class AmbientSounds:
     # Countdown timer for playing sound
     play_timer = 0
 
-    # Storage of sound objects
-    sounds: Dict[int, pygame.mixer.Sound] = {}
+    # Maximum memory (bytes) to use for decoded sounds held in storage
+    memory_budget = 512 * 1024 * 1024
+
+    # Largest sound (bytes decoded) to decode in one go, as decoding holds up a
+    # tick; about three minutes at 44.1khz stereo, a fraction of a second to
+    # decode. Anything larger is streamed
+    max_decode_size = 32 * 1024 * 1024
     current_sound = 0
     animate_chars = "◐◓◑◒"
     animate_position = 0
@@ -98,6 +116,9 @@ class AmbientSounds:
         initialize_sounds=True,
         initial_volume=100.0,
         max_sounds=0,
+        memory_budget=512,
+        backend=None,
+        watch=False,
     ):
         if paths:
             self.paths = paths
@@ -107,6 +128,20 @@ class AmbientSounds:
         self.noinput = bool(noinput)
         self.quiet = bool(quiet)
         self.max_sounds = max_sounds
+        self.backend = backend if backend else PygameBackend()
+        # Storage of sound objects, keyed by sound id
+        self.sounds: Dict[str, pygame.mixer.Sound] = {}
+
+        # Generated sounds in storage, which need topping up every tick
+        self.generated_sounds = set()
+
+        # Files changed or removed on disk while they were in use
+        self.stale_files = set()
+        self.pending_removals = set()
+        if memory_budget is not None:
+            # A budget of 0 means no limit
+            memory_budget = float(memory_budget) * 1024 * 1024
+            self.memory_budget = memory_budget if memory_budget > 0 else float("inf")
 
         # Calculate number of half seconds from minutes
         self.play_duration = float(duration) * (self.fps * 60)
@@ -122,7 +157,12 @@ class AmbientSounds:
         if initial_volume:
             self.volume = min(float(initial_volume) / 100.0, 1.0)
 
+        # Start watching before scanning, so nothing added meanwhile is missed
+        self.watcher = SoundWatcher(self.paths) if watch else None
+
+        self.probe = SoundProbe(self.determine_probe_cache_file())
         self.files = self.load_sound_files()
+        self.probe.save()
         if initialize_sounds:
             self.initialize_sounds()
 
@@ -148,6 +188,13 @@ class AmbientSounds:
 
         return [path]
 
+    def determine_probe_cache_file(self) -> Optional[str]:
+        # Only persist probe results when the ~/.ambience dir exists
+        path = Library.get_home_path(".ambience")
+        if os.path.isdir(path):
+            return os.path.join(path, PROBE_CACHE)
+        return None
+
     def start(self) -> None:
         if len(self.files) == 0:
             print("No sound files to load!")
@@ -166,22 +213,29 @@ class AmbientSounds:
         if sys.stdout.isatty():
             print("\033[?25l")  # Hide cursor
 
-        # Load the first sound
-        self.load_sound(self.current_sound)
-
-        # Start first sound
-        self.sounds[self.get_sound_id(self.current_sound)].set_volume(self.volume)
-        self.sounds[self.get_sound_id(self.current_sound)].play(-1, fade_ms=3000)
+        # Load and start the first sound
+        self.current_sound = self.start_playable_sound(self.current_sound, 3000)
         self.play_timer = int(
-            self.play_duration - (self.fade_duration / 2) - (3 * self.fps)
+            self.get_play_duration(self.current_sound)
+            - (self.fade_duration / 2)
+            - (3 * self.fps)
         )
 
     def tick(self) -> None:
+        self.backend.tick(1.0 / self.fps)
+        if self.watcher:
+            self.update_files(*self.watcher.poll())
         if not self.paused:
             self.handle_play()
+        self.refill_generated_sounds()
         if sys.stdout.isatty() and not self.quiet:
             self.print_current_sound()
 
+    def refill_generated_sounds(self) -> None:
+        """Keep the buffers of any playing generated sounds topped up"""
+        for sound in self.generated_sounds:
+            sound.refill()
+
     def print_current_sound(self) -> None:
         if self.paused:
             print("\r\033[K⏸ [paused] (Press 's' to unpause)", end="")
@@ -224,6 +278,7 @@ class AmbientSounds:
             self.start_next_sound()
 
     def start_next_sound(self, fade_override=None) -> None:
+        self.apply_pending_removals()
         self.current_sound = self.get_next_sound()
 
         self.play_sound(self.current_sound, fade_override)
@@ -237,6 +292,7 @@ class AmbientSounds:
         return next_sound
 
     def start_previous_sound(self, fade_override=None) -> None:
+        self.apply_pending_removals(forward=False)
         self.current_sound = self.get_previous_sound()
 
         self.play_sound(self.current_sound, fade_override)
@@ -264,10 +320,9 @@ class AmbientSounds:
     def play_sound(self, index, fade_override=None) -> None:
         fade_duration, fade_ms = self._get_fade_duration(fade_override)
 
-        self.load_sound(index)
-        self.sounds[self.get_sound_id(index)].set_volume(self.volume)
-        self.sounds[self.get_sound_id(index)].play(-1, fade_ms=fade_ms)
-        self.play_timer = int(self.play_duration - (fade_duration / 2))
+        index = self.start_playable_sound(index, fade_ms)
+        self.current_sound = index
+        self.play_timer = int(self.get_play_duration(index) - (fade_duration / 2))
 
     def stop_sound(self, index, fade_override=None) -> None:
         _, fade_ms = self._get_fade_duration(fade_override)
@@ -278,8 +333,8 @@ class AmbientSounds:
         if not self.quiet:
             print()
             print("Stopping sounds...", flush=True)
-        pygame.mixer.fadeout(duration)
-        pygame.time.wait(duration)
+        self.backend.fadeout(duration)
+        self.backend.wait(duration)
         print("Goodbye.", flush=True)
 
     def _get_fade_duration(self, fade_override=None) -> Tuple[int, int]:
@@ -310,19 +365,17 @@ class AmbientSounds:
     def pause(self) -> None:
         self.paused = not self.paused
         if self.paused:
-            pygame.mixer.pause()
+            self.backend.pause()
         else:
-            pygame.mixer.unpause()
+            self.backend.unpause()
 
     def info(self) -> None:
         print("\nINFO")
-        for i in range(pygame.mixer.get_num_channels()):
-            print(
-                "Channel",
-                i,
-                pygame.mixer.Channel(i).get_volume(),
-                pygame.mixer.Channel(i).get_sound(),
-            )
+        self.backend.info()
+        budget = "unlimited"
+        if self.memory_budget < float("inf"):
+            budget = "{:.1f}MB".format(self.memory_budget / 1048576)
+        print("Memory {:.1f}MB of {}".format(self.get_cached_size() / 1048576, budget))
 
         # for i, f in enumerate(self.files):
         #     sid = self.get_sound_id(i)
@@ -330,20 +383,231 @@ class AmbientSounds:
         #     if sound:
         #         print(i, f, sid, sound, sound.get_volume())
 
-    def load_sound(self, file_index) -> None:
-        if self.get_sound_id(file_index) not in self.sounds:
+    def get_track_duration(self, file_index) -> Optional[float]:
+        """Length of a sound file in seconds from the probe index, if known"""
+
+        info = self.probe.get(self.files[file_index])
+        if info is None:
+            return None
+        return info.get("duration")
+
+    def get_play_duration(self, file_index) -> float:
+        """Number of ticks a sound should play for"""
+
+        if self.is_long(file_index):
+            # Play once through, timed so the fade out ends with the track
+            duration = self.get_track_duration(file_index) or 0
+            return duration * self.fps - (self.fade_duration / 2)
+        return self.play_duration
+
+    def is_long(self, file_index) -> bool:
+        """Whether a sound is long enough to play once through"""
+
+        duration = self.get_track_duration(file_index)
+        return duration is not None and duration * self.fps > self.play_duration
+
+    def is_streamed(self, file_index) -> bool:
+        """Whether a sound plays from disk, being long or too large to decode"""
+
+        return self.is_long(file_index) or not self.can_decode(file_index)
+
+    def get_decoded_size(self, seconds) -> int:
+        """Memory used by the given number of seconds of decoded sound"""
+
+        rate, size, channels = self.backend.get_init()
+        return int(seconds * rate * channels * (abs(size) // 8))
+
+    def get_cached_size(self) -> int:
+        return sum(self.backend.get_memory(sound) for sound in self.sounds.values())
+
+    def fits_in_memory(self, file_index) -> bool:
+        size = self.get_decoded_size(self.get_track_duration(file_index) or 0)
+        return self.get_cached_size() + size <= self.memory_budget
+
+    def can_decode(self, file_index) -> bool:
+        """Whether a sound is small enough to decode within the limits"""
+
+        size = self.get_decoded_size(self.get_track_duration(file_index) or 0)
+        return size <= min(self.max_decode_size, self.memory_budget)
+
+    def free_memory(self, file_index) -> None:
+        """Drop least recently used sounds until the file fits the budget"""
+
+        for sound_id, sound in list(self.sounds.items()):
+            if self.fits_in_memory(file_index):
+                break
+            if self.backend.get_memory(sound) and not sound.get_num_channels():
+                del self.sounds[sound_id]
+
+    def start_playable_sound(self, file_index, fade_ms) -> int:
+        """Load and play a sound, moving on past any that fail
+
+        Streamed sounds only open their file when played, so playing can fail
+        as well as loading. Returns the index of the sound playing.
+        """
+
+        while True:
+            file_index = self.load_playable_sound(file_index)
+            sound = self.sounds[self.get_sound_id(file_index)]
+            try:
+                sound.set_volume(self.volume)
+                sound.play(-1, fade_ms=fade_ms)
+                return file_index
+            except pygame.error as e:
+                self.skip_sound(file_index, e)
+                file_index = self.get_following_sound(file_index)
+
+    def load_playable_sound(self, file_index) -> int:
+        """Load a sound to play, moving on past any that fail to load
+
+        Returns the index of the sound loaded. Anything still playing has been
+        faded out by now, so a stale copy of the sound can be replaced.
+        """
+
+        while not self.load_sound(file_index, replace_playing=True):
+            file_index = self.get_following_sound(file_index)
+
+        return file_index
+
+    def get_following_sound(self, file_index) -> int:
+        """Index of the file that moved into the place of a removed one"""
+
+        if len(self.files) == 0:
+            print("\nNo playable sound files left.")
+            self.the_end()
+
+        if file_index >= len(self.files):
+            return 0
+        return file_index
+
+    def skip_sound(self, file_index, error) -> None:
+        print(
+            "\nERROR {} -- skipping sound '{}'.".format(
+                str(error), self.files[file_index]
+            )
+        )
+        # Remove this file so we skip trying to play it
+        self.remove_file(file_index)
+
+    def load_sound(self, file_index, replace_playing=False) -> bool:
+        sound_id = self.get_sound_id(file_index)
+        cached = self.sounds.get(sound_id)
+        if self.files[file_index] in self.stale_files and (
+            cached is None or replace_playing or not cached.get_num_channels()
+        ):
+            # The file changed on disk since it was loaded; unless told it has
+            # been faded out, a playing old copy is kept so it can be stopped
+            self.stale_files.discard(self.files[file_index])
+            self.sounds.pop(sound_id, None)
+
+        if sound_id in self.sounds:
+            # Keep storage in least recently used order
+            self.sounds[sound_id] = self.sounds.pop(sound_id)
+        else:
             try:
-                self.sounds[self.get_sound_id(file_index)] = pygame.mixer.Sound(
-                    file=self.files[file_index]
-                )
+                path = self.files[file_index]
+                length = self.get_track_duration(file_index)
+                if GeneratedSound.is_spec(path):
+                    sound = self.backend.generate(path)
+                    if isinstance(sound, GeneratedSound):
+                        self.generated_sounds.add(sound)
+                elif self.is_streamed(file_index) and (
+                    not self.backend.is_streaming() or not self.can_decode(file_index)
+                ):
+                    # Long sounds stream from disk, unless another is already
+                    # streaming and this one is small enough to decode to crossfade
+                    sound = self.backend.stream(path, length)
+                else:
+                    self.free_memory(file_index)
+                    if self.fits_in_memory(file_index):
+                        sound = self.backend.load(path, length)
+                    else:
+                        # Sounds still playing hold the memory, so stream this one
+                        sound = self.backend.stream(path, length)
+                self.sounds[sound_id] = sound
             except pygame.error as e:
-                # Remove this file so we skip trying to play it
-                del self.files[file_index]
-                print(
-                    "\nERROR {} -- skipping sound '{}'.".format(
-                        str(e), self.files[file_index]
-                    )
-                )
+                self.skip_sound(file_index, e)
+                return False
+
+        return True
+
+    def remove_file(self, file_index) -> None:
+        """Remove a file from the playlist, keeping cached sounds in step"""
+
+        # Sound ids are derived from the file index, so move the cached sounds
+        # of all following files down by one
+        self.generated_sounds.discard(
+            self.sounds.pop(self.get_sound_id(file_index), None)
+        )
+        for i in range(file_index + 1, len(self.files)):
+            sound = self.sounds.pop(self.get_sound_id(i), None)
+            if sound is not None:
+                self.sounds[self.get_sound_id(i - 1)] = sound
+
+        del self.files[file_index]
+        if file_index < self.current_sound:
+            self.current_sound -= 1
+        if self.current_sound >= len(self.files):
+            self.current_sound = 0
+
+    def update_files(self, changed, removed) -> None:
+        """Apply changes from the watched sound directories to the playlist
+
+        New files are appended so the indexes (and sound ids) of the files
+        already in the playlist stay the same. Unchanged files are not touched.
+        """
+
+        for path in removed:
+            # A removed directory takes all the files in it with it
+            for file in [
+                f for f in self.files if f == path or f.startswith(path + os.sep)
+            ]:
+                self.remove_watched_file(file)
+
+        for path in changed:
+            self.pending_removals.discard(path)
+            if path in self.files:
+                # The probe replaces its entry only if the size or mtime changed
+                entry = self.probe.cache.get(path)
+                valid = []
+                self.add_valid_file(path, valid)
+                if not valid:
+                    self.remove_watched_file(path)
+                elif self.probe.cache.get(path) is not entry:
+                    self.stale_files.add(path)
+            elif self.max_sounds <= 0 or len(self.files) < self.max_sounds:
+                self.add_valid_file(path, self.files)
+                if self.files[-1] == path and not self.quiet:
+                    print("\r\033[KAdded sound '{}'".format(path))
+
+        if changed or removed:
+            self.probe.save()
+
+    def remove_watched_file(self, path) -> None:
+        if not self.quiet:
+            print("\r\033[KRemoved sound '{}'".format(path))
+
+        file_index = self.files.index(path)
+        if file_index == self.current_sound or len(self.files) == 1:
+            # Keep playing it until the next sound starts
+            self.pending_removals.add(path)
+        else:
+            self.remove_file(file_index)
+
+    def apply_pending_removals(self, forward=True) -> None:
+        """Remove files deleted while playing, before moving to the next sound"""
+
+        for path in list(self.pending_removals):
+            if path not in self.files or len(self.files) == 1:
+                continue
+            self.pending_removals.discard(path)
+
+            file_index = self.files.index(path)
+            was_current = file_index == self.current_sound
+            self.remove_file(file_index)
+            if was_current:
+                # Step from the gap it left, so no sound is skipped
+                self.current_sound = file_index - 1 if forward else file_index
 
     def get_sound_id(self, file_index):
         try:
@@ -384,9 +648,27 @@ class AmbientSounds:
         return sorted(files)
 
     def add_valid_file(self, path, files) -> None:
+        if GeneratedSound.is_spec(path):
+            try:
+                GeneratedSound.parse_spec(path)
+                if np is None:
+                    raise ValueError("requires numpy")
+                files.append(path)
+            except ValueError as e:
+                if not self.quiet:
+                    print("Skipping generator '{}': {}".format(path, str(e)))
+            return
+
         patterns = ["*.ogg", "*.wav", "*.flac"]
-        if any(fnmatch(path, pattern) for pattern in patterns):
+        if not any(fnmatch(path, pattern) for pattern in patterns):
+            return
+
+        try:
+            self.probe.probe(path)
             files.append(path)
+        except (OSError, ValueError) as e:
+            if not self.quiet:
+                print("Skipping sound '{}': {}".format(path, str(e)))
 
     def load_sound_files(self) -> List[str]:
         if not self.quiet:
@@ -440,6 +722,10 @@ class AmbientSounds:
         if not self.quiet:
             print("\nInitializing sounds ", end="", flush=True)
         for i, _ in enumerate(self.files):
+            # Long sounds are streamed when played, and the rest only as many
+            # as fit in the memory budget
+            if self.is_streamed(i) or not self.fits_in_memory(i):
+                continue
             if not self.quiet:
                 print(".", end="", flush=True)
             self.load_sound(i)
@@ -499,6 +785,8 @@ class AmbientSounds:
             self.info()
 
     def the_end(self) -> None:
+        if self.watcher:
+            self.watcher.close()
         try:
             self.end_fadeout()
             pygame.quit()
@@ -511,6 +799,563 @@ class AmbientSounds:
         sys.exit(0)
 
 
+class AudioBackend(ABC):
+    """Interface between AmbientSounds and the audio output
+
+    Sounds returned by a backend must behave enough like pygame.mixer.Sound
+    for AmbientSounds: play, fadeout, stop, set_volume, get_volume, get_length
+    and get_num_channels. Loading errors are raised as pygame.error.
+    """
+
+    @abstractmethod
+    def load(self, path, length=None):
+        """Load and decode a sound file into memory"""
+
+    @abstractmethod
+    def stream(self, path, length):
+        """Get a sound that plays a file streamed from disk"""
+
+    @abstractmethod
+    def generate(self, spec):
+        """Get a sound synthesized from a generator spec"""
+
+    @abstractmethod
+    def is_streaming(self) -> bool:
+        """Whether a streamed sound is currently playing"""
+
+    @abstractmethod
+    def get_memory(self, sound) -> int:
+        """Bytes of decoded audio held in memory by a sound"""
+
+    @abstractmethod
+    def get_init(self) -> Tuple[int, int, int]:
+        """Output frequency, sample size and channels, like pygame.mixer.get_init"""
+
+    def tick(self, seconds) -> None:
+        """Called every tick with the number of seconds it represents"""
+
+    @abstractmethod
+    def fadeout(self, fade_ms) -> None:
+        """Fade out everything playing"""
+
+    @abstractmethod
+    def pause(self) -> None:
+        """Pause everything playing"""
+
+    @abstractmethod
+    def unpause(self) -> None:
+        """Resume everything paused"""
+
+    @abstractmethod
+    def wait(self, ms) -> None:
+        """Wait for the given milliseconds of output"""
+
+    @abstractmethod
+    def info(self) -> None:
+        """Print the state of the output"""
+
+
+class PygameBackend(AudioBackend):
+    """Audio output with pygame.mixer"""
+
+    def load(self, path, length=None):
+        return pygame.mixer.Sound(file=path)
+
+    def stream(self, path, length):
+        return StreamedSound(path, length)
+
+    def generate(self, spec):
+        return GeneratedSound(spec)
+
+    def is_streaming(self) -> bool:
+        return StreamedSound.is_busy()
+
+    def get_memory(self, sound) -> int:
+        if not isinstance(sound, pygame.mixer.Sound):
+            return 0
+        rate, size, channels = self.get_init()
+        return int(sound.get_length() * rate * channels * (abs(size) // 8))
+
+    def get_init(self) -> Tuple[int, int, int]:
+        return pygame.mixer.get_init() or (44100, -16, 2)
+
+    def fadeout(self, fade_ms) -> None:
+        pygame.mixer.fadeout(fade_ms)
+        pygame.mixer.music.fadeout(fade_ms)
+
+    def pause(self) -> None:
+        pygame.mixer.pause()
+        pygame.mixer.music.pause()
+
+    def unpause(self) -> None:
+        pygame.mixer.unpause()
+        pygame.mixer.music.unpause()
+
+    def wait(self, ms) -> None:
+        pygame.time.wait(ms)
+
+    def info(self) -> None:
+        for i in range(pygame.mixer.get_num_channels()):
+            print(
+                "Channel",
+                i,
+                pygame.mixer.Channel(i).get_volume(),
+                pygame.mixer.Channel(i).get_sound(),
+            )
+        if StreamedSound.current is not None:
+            print("Music", pygame.mixer.music.get_volume(), StreamedSound.current.path)
+
+
+class NullBackend(AudioBackend):
+    """Audio backend that outputs nothing
+
+    Models the time and memory decoding would cost against a simulated clock
+    that advances with each tick instead of real time, so the playback logic
+    can be run for hours of simulated time in seconds without an audio device.
+    """
+
+    # Simulated seconds of decoding per second of sound decoded
+    decode_factor = 0.01
+
+    def __init__(self, frequency=44100, size=-16, channels=2):
+        self.mixer_init = (frequency, size, channels)
+        self.clock = 0.0
+        self.paused = False
+        self.sounds = weakref.WeakSet()
+
+        # Statistics
+        self.loads = 0
+        self.streams = 0
+        self.plays = 0
+        self.decode_time = 0.0
+        self.peak_memory = 0
+
+    def load(self, path, length=None):
+        rate, size, channels = self.mixer_init
+        memory = int((length or 0) * rate * channels * (abs(size) // 8))
+        sound = NullSound(self, path, length or 0, memory)
+        self.sounds.add(sound)
+        self.loads += 1
+        self.decode_time += (length or 0) * self.decode_factor
+        self.peak_memory = max(self.peak_memory, self.get_total_memory())
+        return sound
+
+    def stream(self, path, length):
+        sound = NullSound(self, path, length, streamed=True)
+        self.sounds.add(sound)
+        self.streams += 1
+        return sound
+
+    def generate(self, spec):
+        GeneratedSound.parse_spec(spec)
+        sound = NullSound(self, spec, 0)
+        self.sounds.add(sound)
+        return sound
+
+    def is_streaming(self) -> bool:
+        return any(sound.streamed and sound.get_num_channels() for sound in self.sounds)
+
+    def get_memory(self, sound) -> int:
+        return sound.memory
+
+    def get_total_memory(self) -> int:
+        """Memory held by all sounds still referenced"""
+        return sum(sound.memory for sound in self.sounds)
+
+    def get_init(self) -> Tuple[int, int, int]:
+        return self.mixer_init
+
+    def tick(self, seconds) -> None:
+        if not self.paused:
+            self.clock += seconds
+
+    def fadeout(self, fade_ms) -> None:
+        for sound in self.sounds:
+            sound.fadeout(fade_ms)
+
+    def pause(self) -> None:
+        self.paused = True
+
+    def unpause(self) -> None:
+        self.paused = False
+
+    def wait(self, ms) -> None:
+        self.clock += ms / 1000.0
+
+    def info(self) -> None:
+        for sound in self.sounds:
+            if sound.get_num_channels():
+                print("Sound", sound.volume, sound.path)
+        print(
+            "Clock {:.1f}s, {} loads, {} streams, {} plays, {:.1f}s decoding".format(
+                self.clock, self.loads, self.streams, self.plays, self.decode_time
+            )
+        )
+
+
+class NullSound:
+    """Silent sound played on the simulated clock of a NullBackend"""
+
+    def __init__(self, backend, path, length, memory=0, streamed=False):
+        self.backend = backend
+        self.path = path
+        self.length = length
+        self.memory = memory
+        self.streamed = streamed
+        self.volume = 1.0
+        self.playing_until = 0.0
+
+    def play(self, loops=-1, fade_ms=0) -> None:  # pylint: disable=unused-argument
+        if self.streamed:
+            # Only one stream plays at a time
+            for sound in self.backend.sounds:
+                if sound.streamed and sound is not self:
+                    sound.stop()
+        if loops < 0:
+            self.playing_until = float("inf")
+        else:
+            self.playing_until = self.backend.clock + self.length * (loops + 1)
+        self.backend.plays += 1
+
+    def fadeout(self, fade_ms) -> None:
+        end = self.backend.clock + fade_ms / 1000.0
+        self.playing_until = min(self.playing_until, end)
+
+    def stop(self) -> None:
+        self.playing_until = min(self.playing_until, self.backend.clock)
+
+    def set_volume(self, level) -> None:
+        self.volume = level
+
+    def get_volume(self) -> float:
+        return self.volume
+
+    def get_length(self) -> float:
+        return self.length
+
+    def get_num_channels(self) -> int:
+        return 1 if self.backend.clock < self.playing_until else 0
+
+
+class GeneratedSound:
+    """Procedurally generated sound source
+
+    Synthesizes noise or binaural tones on the fly in short blocks which are
+    queued on a mixer channel, so nothing is read from disk or decoded and only
+    a couple of seconds of audio are held in memory at a time. Behaves enough
+    like pygame.mixer.Sound to be used in its place by AmbientSounds.
+
+    Specs take the form gen:<kind>[:<param>...], for example:
+     - gen:white, gen:pink, gen:brown
+     - gen:binaural[:<carrier hz>[:<beat hz>]]
+    """
+
+    kinds = {
+        "white": [],
+        "pink": [],
+        "brown": [],
+        "binaural": [200.0, 8.0],
+    }
+
+    # Length of each synthesized block; the queue is refilled on every tick
+    block_seconds = 2
+
+    # Output level relative to full scale
+    amplitude = 0.25
+
+    def __init__(self, spec):
+        if np is None:
+            raise pygame.error("generated sounds require numpy")
+
+        mixer_init = pygame.mixer.get_init()
+        if not mixer_init:
+            raise pygame.error("mixer not initialized")
+
+        self.spec = spec
+        self.kind, self.params = self.parse_spec(spec)
+        self.rate, self.format, self.mixer_channels = mixer_init
+        self.rng = np.random.default_rng()
+        self.channel = None
+        self.volume = 1.0
+
+        # Filter and oscillator state carried between blocks
+        self.state = [0.0, 0.0, 0.0]
+        self.phase = np.zeros(2)
+
+        # Fade envelope
+        self.gain = 1.0
+        self.gain_target = 1.0
+        self.gain_step = 0.0
+        self.stopping = False
+        self.pending = (self.gain, list(self.state), self.phase.copy())
+
+        # Most recent blocks, to tell whether the channel is still ours
+        self.blocks: List[pygame.mixer.Sound] = []
+
+    @classmethod
+    def is_spec(cls, path) -> bool:
+        return str(path).startswith(GENERATOR_PREFIX)
+
+    @classmethod
+    def parse_spec(cls, spec) -> Tuple[str, List[float]]:
+        """Parse generator spec into kind and parameters"""
+
+        parts = spec[len(GENERATOR_PREFIX) :].split(":")
+        kind = parts[0]
+        if kind not in cls.kinds:
+            raise ValueError(
+                "unknown kind '{}', use one of {}".format(kind, ", ".join(cls.kinds))
+            )
+
+        defaults = cls.kinds[kind]
+        if len(parts) - 1 > len(defaults):
+            raise ValueError("too many parameters for '{}'".format(kind))
+
+        params = list(defaults)
+        for i, value in enumerate(parts[1:]):
+            try:
+                params[i] = float(value)
+            except ValueError as e:
+                raise ValueError("invalid parameter '{}'".format(value)) from e
+            if params[i] <= 0:
+                raise ValueError("parameters must be positive")
+
+        return kind, params
+
+    def play(self, loops=-1, fade_ms=0) -> None:  # pylint: disable=unused-argument
+        """Start playing; generated sounds always play until faded out"""
+
+        self.stopping = False
+        self.gain_target = 1.0
+        if fade_ms > 0:
+            self.gain = 0.0
+            self.gain_step = 1.0 / self.ms_to_samples(fade_ms)
+        else:
+            self.gain = 1.0
+
+        self.start_channel()
+        self.queue_block()
+
+    def fadeout(self, fade_ms) -> None:
+        if self.stopping or not self.owns_channel():
+            return
+
+        # Rewind to the start of the block still waiting in the queue (if any)
+        # and replace it with one that already fades
+        if self.channel.get_queue() is not None:
+            self.gain, self.state, self.phase = self.pending
+
+        self.gain_target = 0.0
+        self.gain_step = self.gain / self.ms_to_samples(fade_ms)
+        self.queue_block()
+
+    def stop(self) -> None:
+        self.stopping = True
+        if self.owns_channel():
+            self.channel.stop()
+        self.channel = None
+
+    def set_volume(self, level) -> None:
+        self.volume = level
+        if self.channel is not None and not self.stopping:
+            self.channel.set_volume(level)
+
+    def get_volume(self) -> float:
+        return self.volume
+
+    def get_length(self) -> float:
+        # Endless, and nothing is held in memory
+        return 0.0
+
+    def get_num_channels(self) -> int:
+        return 1 if self.owns_channel() else 0
+
+    def refill(self) -> None:
+        """Queue the next block once the previously queued one starts playing"""
+
+        if self.channel is None or self.stopping:
+            return
+
+        if not self.owns_channel():
+            # Ran dry, so the channel may have gone to another sound
+            self.start_channel()
+        if self.channel is not None and self.channel.get_queue() is None:
+            self.queue_block()
+
+    def owns_channel(self) -> bool:
+        """Whether the channel is playing or queuing one of our blocks"""
+
+        if self.channel is None:
+            return False
+        sound = self.channel.get_sound()
+        queued = self.channel.get_queue()
+        return any(block in (sound, queued) for block in self.blocks)
+
+    def start_channel(self) -> None:
+        if not self.owns_channel():
+            self.channel = pygame.mixer.find_channel(True)
+        channel = self.channel
+        channel.set_volume(self.volume)
+        channel.play(self.next_block())
+
+    def queue_block(self) -> None:
+        # Remember the state the queued block starts from so it can be redone
+        self.pending = (self.gain, list(self.state), self.phase.copy())
+        channel = self.channel
+        channel.queue(self.next_block())
+
+    def ms_to_samples(self, ms) -> int:
+        return max(int(ms * self.rate / 1000), 1)
+
+    def next_block(self) -> pygame.mixer.Sound:
+        """Synthesize the next block as a sound in the mixer's format"""
+
+        size = self.rate * self.block_seconds
+        if self.kind == "binaural":
+            samples = self.binaural(size)
+        else:
+            mono = getattr(self, self.kind)(size) * self.amplitude
+            samples = np.column_stack((mono, mono))
+
+        samples = np.clip(samples * self.envelope(size)[:, None], -1.0, 1.0)
+        if self.mixer_channels == 1:
+            samples = samples.mean(axis=1)
+        elif self.mixer_channels > 2:
+            samples = np.pad(samples, ((0, 0), (0, self.mixer_channels - 2)))
+
+        if self.format == 32:
+            buffer = samples.astype(np.float32)
+        elif self.format == -32:
+            buffer = (samples * 2147483647).astype(np.int32)
+        else:
+            buffer = (samples * 32767).astype(np.int16)
+
+        block = pygame.mixer.Sound(buffer=buffer.tobytes())
+        self.blocks = self.blocks[-2:] + [block]
+        return block
+
+    def envelope(self, size):
+        """Gain ramp for the next block, moving towards the fade target"""
+
+        steps = self.gain_step * np.arange(1, size + 1)
+        if self.gain_target >= self.gain:
+            ramp = np.minimum(self.gain + steps, self.gain_target)
+        else:
+            ramp = np.maximum(self.gain - steps, self.gain_target)
+        self.gain = float(ramp[-1])
+
+        if self.gain_target == 0.0 and self.gain == 0.0:
+            # Faded out: play out this block and let the channel go
+            self.stopping = True
+            self.channel = None
+
+        return ramp
+
+    def white(self, size):
+        return self.rng.standard_normal(size) * 0.5
+
+    def pink(self, size):
+        # Paul Kellet's economy pink filter: three leaky integrators plus white
+        white = self.rng.standard_normal(size)
+        pink = white * 0.1848
+        for i, (pole, weight) in enumerate(
+            ((0.99765, 0.0990460), (0.96300, 0.2965164), (0.57000, 1.0526913))
+        ):
+            filtered, self.state[i] = self.leaky_integrate(
+                white * weight, pole, self.state[i]
+            )
+            pink += filtered
+        return pink * 0.17
+
+    def brown(self, size):
+        pole = 0.998
+        white = self.rng.standard_normal(size) * np.sqrt(1 - pole**2)
+        brown, self.state[0] = self.leaky_integrate(white, pole, self.state[0])
+        return brown * 0.5
+
+    def binaural(self, size):
+        carrier, beat = self.params
+        freqs = np.array([carrier, carrier + beat])
+        cycles = self.phase + np.outer(np.arange(1, size + 1), freqs) / self.rate
+        self.phase = cycles[-1] % 1.0
+        return np.sin(2 * np.pi * cycles) * self.amplitude
+
+    @classmethod
+    def leaky_integrate(cls, samples, pole, state) -> Tuple:
+        """Apply y[n] = pole * y[n - 1] + x[n] to samples, starting from state
+
+        Runs vectorized over segments short enough that pole ** -length stays
+        numerically safe, carrying the state from one segment to the next.
+        """
+
+        length = len(samples)
+        segment = max(1, min(length, int(np.log(1e6) / -np.log(pole))))
+        rows = np.pad(samples, (0, -length % segment)).reshape(-1, segment)
+        powers = pole ** np.arange(1, segment + 1)
+        zero_state = np.cumsum(rows / powers, axis=1) * powers
+
+        output = np.empty_like(zero_state)
+        for i, row in enumerate(zero_state):
+            output[i] = row + powers * state
+            state = output[i, -1]
+
+        output = output.ravel()[:length]
+        return output, float(output[-1])
+
+
+class StreamedSound:
+    """Long sound file streamed from disk with pygame.mixer.music
+
+    Only a small buffer is decoded at a time instead of the whole file, but
+    there is a single music stream, so starting one streamed sound cuts off any
+    other. Behaves enough like pygame.mixer.Sound to be used in its place by
+    AmbientSounds.
+    """
+
+    # The streamed sound that currently owns the music stream
+    current = None
+
+    def __init__(self, path, length):
+        self.path = path
+        self.length = length
+        self.volume = 1.0
+
+    @classmethod
+    def is_busy(cls) -> bool:
+        return cls.current is not None and pygame.mixer.music.get_busy()
+
+    def play(self, loops=-1, fade_ms=0) -> None:
+        pygame.mixer.music.load(self.path)
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(loops, fade_ms=fade_ms)
+        StreamedSound.current = self
+
+    def fadeout(self, fade_ms) -> None:
+        if StreamedSound.current is self:
+            pygame.mixer.music.fadeout(fade_ms)
+
+    def stop(self) -> None:
+        if StreamedSound.current is self:
+            pygame.mixer.music.stop()
+            StreamedSound.current = None
+
+    def set_volume(self, level) -> None:
+        self.volume = level
+        if StreamedSound.current is self:
+            pygame.mixer.music.set_volume(level)
+
+    def get_volume(self) -> float:
+        return self.volume
+
+    def get_length(self) -> float:
+        return self.length
+
+    def get_num_channels(self) -> int:
+        if StreamedSound.current is self and StreamedSound.is_busy():
+            return 1
+        return 0
+
+
 class StdinReader:
     """Stdin reader"""
 
@@ -543,6 +1388,377 @@ class StdinReader:
             fcntl.fcntl(self.fd, fcntl.F_SETFL, self.orig_fl)
 
 
+class SoundProbe:
+    """Validates sound files by reading only their headers
+
+    Codec, channels, sample rate and duration are read without decoding any
+    audio, so broken or unsupported files are rejected when scanning instead of
+    failing during playback. Results are cached by path, size and modification
+    time so unchanged files are only probed once.
+    """
+
+    wav_formats = {
+        0x0001: "pcm",
+        0x0002: "adpcm",
+        0x0003: "float",
+        0x0006: "alaw",
+        0x0007: "mulaw",
+        0x0011: "ima-adpcm",
+        0xFFFE: "extensible",
+    }
+    max_channels = 8
+    min_rate = 8000
+    max_rate = 192000
+
+    # How much of the end of an ogg file to search for the last page
+    ogg_tail_bytes = 65536
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file
+        self.cache: Dict[str, Dict] = {}
+        self.changed = False
+
+        if cache_file and os.path.isfile(cache_file):
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError):
+                self.cache = {}
+
+    def probe(self, path) -> Dict:
+        """Get header info for a sound file, raises ValueError if unusable"""
+
+        stat = os.stat(path)
+        entry = self.cache.get(path)
+        if (
+            entry is None
+            or entry.get("size") != stat.st_size
+            or entry.get("mtime") != stat.st_mtime
+        ):
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime}
+            try:
+                entry["info"] = self.read_header(path, stat.st_size)
+            except ValueError as e:
+                # Remember bad files too, so they are rejected cheaply next time
+                entry["error"] = str(e)
+            self.cache[path] = entry
+            self.changed = True
+
+        if entry.get("error"):
+            raise ValueError(entry["error"])
+        return entry["info"]
+
+    def get(self, path) -> Optional[Dict]:
+        """Get already probed info for a sound file, if any"""
+
+        entry = self.cache.get(path)
+        if entry is None:
+            return None
+        return entry.get("info")
+
+    def save(self) -> None:
+        if not self.cache_file or not self.changed:
+            return
+
+        # Drop entries for files that no longer exist
+        self.cache = {
+            path: entry for path, entry in self.cache.items() if os.path.isfile(path)
+        }
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f)
+            self.changed = False
+        except OSError as e:
+            print("Could not write probe cache '{}': {}".format(self.cache_file, e))
+
+    def read_header(self, path, size) -> Dict:
+        with open(path, "rb") as f:
+            magic = f.read(4)
+            f.seek(0)
+            try:
+                if magic == b"OggS":
+                    info = self.read_ogg(f, size)
+                elif magic == b"RIFF":
+                    info = self.read_wav(f)
+                elif magic in (b"fLaC", b"ID3\x03", b"ID3\x04"):
+                    info = self.read_flac(f)
+                else:
+                    raise ValueError("unrecognized file format")
+            except struct.error as e:
+                # Any header field cut short by the end of the file
+                raise ValueError("truncated header") from e
+
+        if not 1 <= info["channels"] <= self.max_channels:
+            raise ValueError("unsupported channel count {}".format(info["channels"]))
+        if not self.min_rate <= info["rate"] <= self.max_rate:
+            raise ValueError("unsupported sample rate {}".format(info["rate"]))
+        if info["duration"] is not None and info["duration"] <= 0:
+            raise ValueError("no audio data")
+
+        return info
+
+    def read_ogg(self, f, size) -> Dict:
+        header = f.read(512)
+        if len(header) < 28:
+            raise ValueError("truncated ogg header")
+
+        serial = struct.unpack_from("<I", header, 14)[0]
+        packet = header[27 + header[26] :]
+        if packet.startswith(b"\x01vorbis") and len(packet) >= 16:
+            codec = "vorbis"
+            channels = packet[11]
+            rate = struct.unpack_from("<I", packet, 12)[0]
+            granule_rate, pre_skip = rate, 0
+        elif packet.startswith(b"OpusHead") and len(packet) >= 12:
+            # Opus always decodes at 48khz
+            codec = "opus"
+            channels = packet[9]
+            rate = 48000
+            granule_rate, pre_skip = rate, struct.unpack_from("<H", packet, 10)[0]
+        else:
+            raise ValueError("unsupported ogg codec")
+
+        # The granule position of the last page is the total number of samples
+        f.seek(max(size - self.ogg_tail_bytes, 0))
+        tail = f.read()
+        position = tail.rfind(b"OggS")
+        while position >= 0:
+            if len(tail) - position >= 27:
+                granule, page_serial = struct.unpack_from("<qI", tail, position + 6)
+                if page_serial == serial and granule > 0:
+                    duration = (granule - pre_skip) / granule_rate
+                    return {
+                        "codec": codec,
+                        "channels": channels,
+                        "rate": rate,
+                        "duration": duration,
+                    }
+            position = tail.rfind(b"OggS", 0, position)
+
+        raise ValueError("cannot determine ogg length")
+
+    def read_wav(self, f) -> Dict:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[8:12] != b"WAVE":
+            raise ValueError("invalid wav header")
+
+        fmt = None
+        data_size = None
+        while fmt is None or data_size is None:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+            if chunk_id == b"fmt ":
+                fmt_data = f.read(16)
+                if chunk_size < 16 or len(fmt_data) < 16:
+                    raise ValueError("invalid wav format chunk")
+                fmt = struct.unpack("<HHIIHH", fmt_data)
+                chunk_size -= 16
+            elif chunk_id == b"data":
+                data_size = chunk_size
+            f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+        if fmt is None or data_size is None:
+            raise ValueError("missing wav format or data")
+
+        format_tag, channels, rate, byte_rate, _, _ = fmt
+        if format_tag not in self.wav_formats:
+            raise ValueError("unsupported wav format 0x{:04x}".format(format_tag))
+        if byte_rate == 0:
+            raise ValueError("invalid wav byte rate")
+
+        return {
+            "codec": self.wav_formats[format_tag],
+            "channels": channels,
+            "rate": rate,
+            "duration": data_size / byte_rate,
+        }
+
+    def read_flac(self, f) -> Dict:
+        magic = f.read(4)
+        if magic.startswith(b"ID3"):
+            # Skip a leading ID3v2 tag, its size is a 28 bit syncsafe integer
+            tag_header = magic + f.read(6)
+            tag_size = 0
+            for byte in tag_header[6:10]:
+                tag_size = (tag_size << 7) | (byte & 0x7F)
+            f.seek(10 + tag_size)
+            magic = f.read(4)
+        if magic != b"fLaC":
+            raise ValueError("invalid flac header")
+
+        block = f.read(4 + 34)
+        if len(block) < 38 or block[0] & 0x7F != 0:
+            raise ValueError("missing flac stream info")
+
+        # Sample rate (20 bits), channels - 1 (3), bits - 1 (5), total samples (36)
+        fields = int.from_bytes(block[14:22], "big")
+        rate = fields >> 44
+        channels = ((fields >> 41) & 0x7) + 1
+        total_samples = fields & 0xFFFFFFFFF
+
+        return {
+            "codec": "flac",
+            "channels": channels,
+            "rate": rate,
+            "duration": total_samples / rate if total_samples and rate else None,
+        }
+
+
+class SoundWatcher:
+    """Watches sound directories for added, changed and removed files
+
+    Uses inotify where available (linux) and otherwise polls the directories,
+    comparing file sizes and modification times.
+    """
+
+    # Seconds between scans when polling
+    poll_interval = 10
+
+    # inotify constants from <sys/inotify.h>
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    def __init__(self, paths):
+        self.paths = [path for path in paths if os.path.isdir(path)]
+        self.watches: Dict[int, str] = {}
+        self.libc = None
+        self.fd = None
+
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        except (AttributeError, OSError):
+            self.fd = None
+
+        if self.fd is not None and self.fd >= 0:
+            for path in self.paths:
+                self.add_watches(path)
+        else:
+            self.fd = None
+            self.snapshot = self.scan()
+            self.last_poll = time.time()
+
+    def add_watches(self, path) -> List[str]:
+        """Watch a directory and its subdirectories, returns the files in them"""
+
+        mask = (
+            self.IN_CLOSE_WRITE
+            | self.IN_MOVED_FROM
+            | self.IN_MOVED_TO
+            | self.IN_CREATE
+            | self.IN_DELETE
+            | self.IN_DELETE_SELF
+        )
+
+        files = []
+        for root, _, filenames in os.walk(path):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), mask)
+            if wd >= 0:
+                self.watches[wd] = root
+            files.extend(os.path.join(root, f) for f in filenames)
+        return files
+
+    def close(self) -> None:
+        """Stop watching, releasing the inotify file descriptor"""
+
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+            self.watches = {}
+        # Polling afterwards scans nothing and reports nothing
+        self.paths = []
+        self.snapshot = {}
+        self.last_poll = 0
+
+    def poll(self) -> Tuple[List[str], List[str]]:
+        """Get the files added or changed, and the paths removed since last poll"""
+
+        if self.fd is None:
+            return self.poll_scan()
+        return self.poll_inotify()
+
+    def poll_inotify(self) -> Tuple[List[str], List[str]]:
+        changed: List[str] = []
+        removed: List[str] = []
+
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changed, removed
+
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16 : offset + 16 + length].rstrip(b"\0")
+            offset += 16 + length
+
+            if mask & self.IN_DELETE_SELF:
+                self.watches.pop(wd, None)
+                continue
+            if wd not in self.watches or not name:
+                continue
+
+            path = os.path.join(self.watches[wd], os.fsdecode(name))
+            if mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                removed.append(path)
+            elif mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    changed.extend(self.add_watches(path))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                changed.append(path)
+            elif mask & self.IN_CREATE and self.is_link(path):
+                # Links are complete once created and are never written to
+                changed.append(path)
+
+        return changed, removed
+
+    @staticmethod
+    def is_link(path) -> bool:
+        """Whether a path is a symlink or a hard link to an existing file"""
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return os.path.islink(path) or stat.st_nlink > 1
+
+    def poll_scan(self) -> Tuple[List[str], List[str]]:
+        if time.time() - self.last_poll < self.poll_interval:
+            return [], []
+        self.last_poll = time.time()
+
+        snapshot = self.scan()
+        changed = [
+            path for path, stat in snapshot.items() if self.snapshot.get(path) != stat
+        ]
+        removed = [path for path in self.snapshot if path not in snapshot]
+        self.snapshot = snapshot
+
+        return changed, removed
+
+    def scan(self) -> Dict[str, Tuple[int, float]]:
+        snapshot = {}
+        for path in self.paths:
+            for root, _, filenames in os.walk(path):
+                for filename in filenames:
+                    full = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(full)
+                    except OSError:
+                        continue
+                    snapshot[full] = (stat.st_size, stat.st_mtime)
+        return snapshot
+
+
 class Library:
     """Handles the sound library functions"""
 
@@ -666,6 +1882,13 @@ class Library:
 def main():
     # Handle command line arguments
     parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-b",
+        "--backend",
+        default="pygame",
+        choices=BACKENDS,
+        help="set the audio backend, null plays silently: default=pygame",
+    )
     parser.add_argument(
         "-d",
         "--duration",
@@ -690,6 +1913,13 @@ def main():
         action="store_false",
         help="do not pre-initialize all sounds at start",
     )
+    parser.add_argument(
+        "-M",
+        "--memory",
+        default=512,
+        help="set the memory in MB to use for holding decoded sounds, "
+        "0 for no limit: default=512",
+    )
     parser.add_argument(
         "-n", "--noinput", action="store_true", help="disable the stdin input capture"
     )
@@ -703,6 +1933,12 @@ def main():
     parser.add_argument(
         "-v", "--version", action="store_true", help="show version and exit"
     )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="watch sound paths and pick up added, changed or removed files",
+    )
     parser.add_argument("paths", nargs="*", help="load given sound file(s) or path(s)")
 
     # Returns tuple of args and remaining (unhandled args)
@@ -721,7 +1957,10 @@ def main():
 
     # Determine paths to sounds
     if args.paths:
-        sounds_paths = [os.path.abspath(path) for path in args.paths]
+        sounds_paths = [
+            path if GeneratedSound.is_spec(path) else os.path.abspath(path)
+            for path in args.paths
+        ]
     else:
         sounds_paths = None
         if args.path:
@@ -739,6 +1978,9 @@ def main():
         initialize_sounds=args.noinit,
         initial_volume=args.volume,
         max_sounds=int(args.max_sounds),
+        memory_budget=args.memory,
+        backend=NullBackend() if args.backend == "null" else PygameBackend(),
+        watch=args.watch,
     )
     ambience.start()
 
@@ -0,0 +1,217 @@
+"""Tests for keeping the playlist and cached sounds in step"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+# pylint: disable=wrong-import-position
+import pygame
+from ambience import AmbientSounds, NullBackend, NullSound
+
+
+def write_wav(path, seconds=1, rate=8000):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b"\0\0" * int(rate * seconds))
+
+
+class BrokenSound(NullSound):
+    """Sound whose file only turns out to be unreadable when played"""
+
+    def play(self, loops=-1, fade_ms=0) -> None:
+        raise pygame.error("Unrecognized audio format")
+
+
+class BrokenBackend(NullBackend):
+    """NullBackend that fails to load or play some files"""
+
+    def __init__(self):
+        super().__init__()
+        self.broken_loads = set()
+        self.broken_plays = set()
+
+    def load(self, path, length=None):
+        if path in self.broken_loads:
+            raise pygame.error("Unable to open file '{}'".format(path))
+        if path in self.broken_plays:
+            return BrokenSound(self, path, length or 0)
+        return super().load(path, length)
+
+
+class PlaylistTest(unittest.TestCase):
+    """Removing files shifts the cached sounds with them"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.dir.cleanup)
+        # Keep the probe cache out of the real home directory
+        patcher = mock.patch.dict(os.environ, {"HOME": self.dir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.sounds_dir = os.path.join(self.dir.name, "sounds")
+        os.mkdir(self.sounds_dir)
+        self.backend = BrokenBackend()
+
+    def make_player(self, names, load=True):
+        """Player for the named sounds, in that order, all loaded unless told"""
+
+        for name in names:
+            write_wav(self.path(name))
+
+        player = AmbientSounds(
+            paths=[self.sounds_dir],
+            noinput=True,
+            quiet=True,
+            initialize_sounds=False,
+            backend=self.backend,
+        )
+        player.files.sort()
+        if load:
+            for i, _ in enumerate(player.files):
+                player.load_sound(i)
+        return player
+
+    def path(self, name):
+        return os.path.join(self.sounds_dir, name)
+
+    def assert_sounds_paired(self, player):
+        """Every cached sound is stored under the id of its file's index"""
+
+        indexes = {player.get_sound_id(i): i for i, _ in enumerate(player.files)}
+        for sound_id, sound in player.sounds.items():
+            self.assertIn(sound_id, indexes)
+            self.assertEqual(sound.path, player.files[indexes[sound_id]])
+
+    def test_remove_before_current(self):
+        player = self.make_player(["a.wav", "b.wav", "c.wav", "d.wav"])
+        player.play_sound(2)
+
+        player.update_files([], [self.path("a.wav")])
+
+        self.assertEqual(player.current_sound, 1)
+        self.assertEqual(player.files[player.current_sound], self.path("c.wav"))
+        self.assertNotIn(self.path("a.wav"), player.files)
+        self.assertEqual(len(player.sounds), 3)
+        self.assert_sounds_paired(player)
+
+    def test_remove_after_current(self):
+        player = self.make_player(["a.wav", "b.wav", "c.wav", "d.wav"])
+        player.play_sound(1)
+
+        player.update_files([], [self.path("c.wav")])
+
+        self.assertEqual(player.current_sound, 1)
+        self.assertEqual(player.files[player.current_sound], self.path("b.wav"))
+        self.assertNotIn(self.path("c.wav"), player.files)
+        self.assertEqual(len(player.sounds), 3)
+        self.assert_sounds_paired(player)
+
+    def test_remove_current(self):
+        player = self.make_player(["a.wav", "b.wav", "c.wav", "d.wav"])
+        player.play_sound(1)
+
+        # The current sound keeps playing until the next one starts
+        player.update_files([], [self.path("b.wav")])
+        self.assertIn(self.path("b.wav"), player.files)
+        self.assertEqual(player.files[player.current_sound], self.path("b.wav"))
+
+        player.next()
+
+        self.assertNotIn(self.path("b.wav"), player.files)
+        self.assertEqual(player.files[player.current_sound], self.path("c.wav"))
+        self.assertFalse(player.pending_removals)
+        self.assert_sounds_paired(player)
+
+    def test_remove_only_file(self):
+        player = self.make_player(["a.wav"])
+        player.play_sound(0)
+
+        player.update_files([], [self.path("a.wav")])
+        player.next()
+
+        # With nothing to move on to, the last sound plays on
+        self.assertEqual(player.files, [self.path("a.wav")])
+        self.assertEqual(player.current_sound, 0)
+        self.assertIn(self.path("a.wav"), player.pending_removals)
+        self.assertTrue(player.sounds[player.get_sound_id(0)].get_num_channels())
+        self.assert_sounds_paired(player)
+
+    def test_changed_file_while_playing(self):
+        player = self.make_player(["a.wav"])
+        player.play_sound(0)
+        playing = player.sounds[player.get_sound_id(0)]
+
+        write_wav(self.path("a.wav"), seconds=2)
+        player.update_files([self.path("a.wav")], [])
+
+        # The old copy is kept while it plays, so it can be faded out
+        self.assertIn(self.path("a.wav"), player.stale_files)
+        self.assertIs(player.sounds[player.get_sound_id(0)], playing)
+
+        player.next()
+
+        sound = player.sounds[player.get_sound_id(0)]
+        self.assertIsNot(sound, playing)
+        self.assertEqual(sound.get_length(), 2.0)
+        self.assertNotIn(self.path("a.wav"), player.stale_files)
+        looping = [s for s in self.backend.sounds if s.playing_until == float("inf")]
+        self.assertEqual(looping, [sound])
+
+    def test_unchanged_file_is_not_reloaded(self):
+        player = self.make_player(["a.wav", "b.wav"])
+
+        player.update_files([self.path("a.wav")], [])
+
+        self.assertFalse(player.stale_files)
+        self.assertEqual(self.backend.loads, 2)
+
+    def test_failed_load_shifts_sound_ids(self):
+        player = self.make_player(["a.wav", "b.wav", "c.wav", "d.wav", "e.wav"])
+        player.play_sound(4)
+        self.backend.broken_loads.add(self.path("c.wav"))
+        player.sounds.pop(player.get_sound_id(2))
+
+        with mock.patch("sys.stdout"):
+            self.assertFalse(player.load_sound(2))
+
+        self.assertNotIn(self.path("c.wav"), player.files)
+        self.assertEqual(player.current_sound, 3)
+        self.assertEqual(player.files[player.current_sound], self.path("e.wav"))
+        self.assertEqual(len(player.sounds), 4)
+        self.assert_sounds_paired(player)
+
+    def test_failed_load_plays_following_sound(self):
+        player = self.make_player(["a.wav", "b.wav", "c.wav"], load=False)
+        self.backend.broken_loads.add(self.path("b.wav"))
+
+        with mock.patch("sys.stdout"):
+            player.play_sound(1)
+
+        self.assertEqual(player.current_sound, 1)
+        self.assertEqual(player.files[player.current_sound], self.path("c.wav"))
+        self.assertTrue(player.sounds[player.get_sound_id(1)].get_num_channels())
+        self.assert_sounds_paired(player)
+
+    def test_failed_play_plays_following_sound(self):
+        player = self.make_player(["a.wav", "b.wav", "c.wav"], load=False)
+        self.backend.broken_plays.add(self.path("c.wav"))
+
+        with mock.patch("sys.stdout"):
+            player.play_sound(2)
+
+        self.assertNotIn(self.path("c.wav"), player.files)
+        self.assertEqual(player.current_sound, 0)
+        self.assertEqual(player.files[player.current_sound], self.path("a.wav"))
+        self.assert_sounds_paired(player)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for SoundProbe header parsing"""
+
+import os
+import struct
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from ambience import SoundProbe  # pylint: disable=wrong-import-position
+
+
+def wav_header(channels=2, rate=44100, seconds=1):
+    byte_rate = rate * channels * 2
+    fmt = struct.pack("<HHIIHH", 1, channels, rate, byte_rate, channels * 2, 16)
+    data_size = byte_rate * seconds
+    return (
+        b"RIFF"
+        + struct.pack("<I", 36 + data_size)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack("<I", len(fmt))
+        + fmt
+        + b"data"
+        + struct.pack("<I", data_size)
+        + b"\0" * data_size
+    )
+
+
+def ogg_page(packet, granule, serial=1):
+    return (
+        b"OggS"
+        + struct.pack("<BBqIII", 0, 2, granule, serial, 0, 0)
+        + bytes([1, len(packet)])
+        + packet
+    )
+
+
+def ogg_header(channels=2, rate=44100, seconds=1):
+    packet = b"\x01vorbis" + struct.pack("<IBI", 0, channels, rate) + b"\0" * 14
+    return ogg_page(packet, 0) + ogg_page(b"\0" * 8, rate * seconds)
+
+
+def flac_header(channels=2, rate=44100, seconds=1):
+    fields = (rate << 44) | ((channels - 1) << 41) | (15 << 36) | (rate * seconds)
+    streaminfo = b"\0" * 10 + fields.to_bytes(8, "big") + b"\0" * 16
+    return b"fLaC" + bytes([0x80, 0, 0, 34]) + streaminfo
+
+
+class SoundProbeTest(unittest.TestCase):
+    """SoundProbe reads headers and rejects broken files with ValueError"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.probe = SoundProbe()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_valid_headers(self):
+        for name, header, codec in (
+            ("a.wav", wav_header(), "pcm"),
+            ("a.ogg", ogg_header(), "vorbis"),
+            ("a.flac", flac_header(), "flac"),
+        ):
+            info = self.probe.probe(self.write(name, header))
+            self.assertEqual(info["codec"], codec)
+            self.assertEqual(info["channels"], 2)
+            self.assertEqual(info["rate"], 44100)
+            self.assertAlmostEqual(info["duration"], 1.0)
+
+    def test_truncated_and_empty_files(self):
+        for name, header in (
+            ("a.wav", wav_header()),
+            ("a.ogg", ogg_header()),
+            ("a.flac", flac_header()),
+        ):
+            for length in (0, 4, 12, 20, 28, 40):
+                path = self.write(name, header[:length])
+                with self.assertRaises(ValueError, msg="{} {}".format(name, length)):
+                    self.probe.probe(path)
+
+    def test_rejection_is_cached(self):
+        path = self.write("trunc.wav", wav_header()[:28])
+        with self.assertRaises(ValueError):
+            self.probe.probe(path)
+        self.assertIn("error", self.probe.cache[path])
+        self.assertIsNone(self.probe.get(path))
+
+
+if __name__ == "__main__":
+    unittest.main()